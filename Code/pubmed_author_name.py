@@ -1,11 +1,13 @@
 from dataclasses import dataclass
 
-@dataclass()
+# slots: the fetcher creates one instance per author, so no per-instance __dict__ is kept
+@dataclass(slots=True)
 class PubMedAuthorName:
     given_name: str = ''
     family_name: str = ''
 
-@dataclass()
+# slots: the name dictionary holds one instance per distinct name
+@dataclass(slots=True)
 class PubMedAuthorNameStatItem:
     id: int = 0
     value: str = ''
@@ -1,10 +1,28 @@
+import csv
+import gzip
+import hashlib
 import json
-from xml.dom import minidom
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
+from typing import Optional
+from urllib.parse import urlencode
 
 import requests
-import xml.etree.ElementTree as ET
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError as UrllibHTTPError
+from urllib3.util.retry import Retry
 from pubmed_author_name import PubMedAuthorName
-from xml.etree.ElementTree import Element as XElement
+from pumedoro_xml import etree, compile_path, iterparse_elements
+from request_rate_limiter import RequestRateLimiter
+
+# orjson is optional: it serializes the author list much faster than json, with byte-identical output.
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 
 class PubMedNameFetcher:
@@ -14,21 +32,117 @@ class PubMedNameFetcher:
 
     #region Class Constants
     # default URL base to query for publication IDs.
-    NCBI_SEARCH_REQUEST_BASE            = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi?db=pubmed"
+    NCBI_SEARCH_REQUEST_BASE            = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi"
 
     # Number of IDs in a partial request for IDs.
     NUMBER_OF_IDS_IN_PARTIAL_REQUEST    = 1000
 
+    # Maximum number of finds of a query whose IDs can be paged through (esearch does not go beyond 10000).
+    MAXIMUM_NUMBER_OF_FINDS             = 10000
+
     # Default URL base to fetch the publication infos.
-    NCBI_FETCH_REQUEST_BASE             = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi?db=pubmed"
+    NCBI_FETCH_REQUEST_BASE             = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi"
+
+    # Entrez database to query.
+    NCBI_DATABASE                       = "pubmed"
+
+    # Default number of entries in an extraction portion (the IDs are posted, so the URL length does not limit it).
+    DEFAULT_SIZE_OF_EXTRACTION_PORTION  = 500
+
+    # Number of extraction portions fetched concurrently (NCBI allows 3 requests per second without an API key).
+    NUMBER_OF_CONCURRENT_REQUESTS       = 3
+
+    # Number of extraction portions fetched concurrently with an API key.
+    NUMBER_OF_CONCURRENT_REQUESTS_WITH_API_KEY = 10
+
+    # Maximal number of requests per second sent to NCBI without an API key.
+    REQUESTS_PER_SECOND                 = 3
+
+    # Maximal number of requests per second sent to NCBI with an API key.
+    REQUESTS_PER_SECOND_WITH_API_KEY    = 10
+
+    # Environment variable holding the NCBI API key, used if no key is passed to the fetcher.
+    API_KEY_VARIABLE                    = "NCBI_API_KEY"
+
+    # Name of the tool, sent to NCBI with every request as the User-Agent and the 'tool' parameter.
+    TOOL_NAME                           = "Pumedoro"
 
-    # Default number of entries in an extraction portion.
-    DEFAULT_SIZE_OF_EXTRACTION_PORTION  = 200
+    # Number of pooled connections to the NCBI server.
+    NUMBER_OF_POOLED_CONNECTIONS        = 10
+
+    # Retry policy for failed requests; a 429 (Too Many Requests) is retried after the delay given by the server.
+    # POST is retried too, as posting IDs to efetch is idempotent.
+    RETRY_POLICY                        = Retry(total=5, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                                                allowed_methods=["GET", "POST"], respect_retry_after_header=True)
+
+    # Default folder of the response cache.
+    DEFAULT_CACHE_FOLDER                = ".ncbi_cache"
+
+    # Time in seconds after which a cached response expires (search results change as articles are added).
+    CACHE_EXPIRATION                    = 86400
+
+    # Timeouts of a request in seconds: for connecting, and for reading the response of a slow efetch portion.
+    REQUEST_TIMEOUT                     = (5, 60)
+
+    # Precompiled path from a PubmedArticle element to its authors.
+    XPATH_AUTHORS                       = compile_path('MedlineCitation/Article/AuthorList/Author')
     #endregion
 
     #region Initialization
-    def __init__(self):
+    def __init__(self, use_cache: bool = False, cache_folder: str = DEFAULT_CACHE_FOLDER, email: Optional[str] = None,
+                 api_key: Optional[str] = None):
+        '''
+        Initializes the fetcher.
+        @param use_cache: If True, the responses of esearch and efetch are cached on the disk for CACHE_EXPIRATION
+        seconds, so that repeated and overlapping queries are answered without the server; default: False.
+        @param cache_folder: The folder of the cache, default: DEFAULT_CACHE_FOLDER.
+        @param email: The e-mail address NCBI may use to contact the user of the tool (recommended by NCBI's policy).
+        @param api_key: The NCBI API key, which raises the allowed request rate; default: the value of the environment
+        variable API_KEY_VARIABLE, if set.
+        '''
         self._authors = []
+        self._cache_folder = cache_folder if use_cache else None
+
+        if self._cache_folder is not None:
+            os.makedirs(self._cache_folder, exist_ok=True)
+
+        # one session for all requests, so that the TLS connections to the server are kept alive and reused
+        adapter = HTTPAdapter(pool_connections=PubMedNameFetcher.NUMBER_OF_POOLED_CONNECTIONS,
+                              pool_maxsize=PubMedNameFetcher.NUMBER_OF_POOLED_CONNECTIONS,
+                              max_retries=PubMedNameFetcher.RETRY_POLICY)
+        self._session = requests.Session()
+        self._session.mount("https://", adapter)
+
+        # identify the tool in every request, as asked for by NCBI's E-utilities policy
+        self._session.headers["User-Agent"] = PubMedNameFetcher.TOOL_NAME
+        self._session.params = {'tool': PubMedNameFetcher.TOOL_NAME}
+        if email is not None:
+            self._session.params['email'] = email
+
+        if api_key is None:
+            api_key = os.environ.get(PubMedNameFetcher.API_KEY_VARIABLE)
+
+        # NCBI blocks clients exceeding the rate allowed, so the requests of all threads are throttled together
+        if api_key:
+            self._session.params['api_key'] = api_key
+            self._number_of_concurrent_requests = PubMedNameFetcher.NUMBER_OF_CONCURRENT_REQUESTS_WITH_API_KEY
+            self._rate_limiter = RequestRateLimiter(PubMedNameFetcher.REQUESTS_PER_SECOND_WITH_API_KEY)
+        else:
+            self._number_of_concurrent_requests = PubMedNameFetcher.NUMBER_OF_CONCURRENT_REQUESTS
+            self._rate_limiter = RequestRateLimiter(PubMedNameFetcher.REQUESTS_PER_SECOND)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        '''
+        Closes the connections held by the fetcher.
+        @return: None.
+        '''
+        self._session.close()
     #endregion
 
     #region Properties
@@ -38,32 +152,44 @@ class PubMedNameFetcher:
     #endregion
 
     #region Public Features
-    def fetch_author_names(self, token: str):
+    def fetch_author_names(self, token: str, overwrite: bool = True, number_of_finds: Optional[int] = None):
         '''
         Fetches author names from PubMed server by a token
-        @param token: the token to fetch by.
+        @param token: the token to fetch by: a PubMed query like "education nurse China" (URL-encoded when sent).
+        @param overwrite: If True (default), the authors fetched replace the ones fetched before;
+        otherwise they are appended to them.
+        @param number_of_finds: The number of articles found for the token, if already known; None (default): it is
+        requested from the server.
         @return: None, the result is in self._authors.
         '''
-        ids = self._get_article_ids_for_token(token)
+        ids = self._get_article_ids_for_token(token, number_of_finds)
 
-        self._authors = []
+        if overwrite:
+            self._authors = []
+
+        size = PubMedNameFetcher.DEFAULT_SIZE_OF_EXTRACTION_PORTION
+        portions = [ids[start:start + size] for start in range(0, len(ids), size)]
 
-        start = 0
-        extract = True
-        while extract:
-            print(f"Extracting authors with IDs from {start} to {min(len(ids), start + PubMedNameFetcher.DEFAULT_SIZE_OF_EXTRACTION_PORTION)}")
-            authors = self._extract_authors(ids[start:start + PubMedNameFetcher.DEFAULT_SIZE_OF_EXTRACTION_PORTION])
-            self._authors += authors
-            print(f"Extracted {len(authors)} authors")
-            start += PubMedNameFetcher.DEFAULT_SIZE_OF_EXTRACTION_PORTION
-            extract = start <= len(ids)
+        print(f"Extracting authors from {len(ids)} articles in {len(portions)} portions")
+
+        # the portions are fetched concurrently; map() yields the results in the order of the portions
+        with ThreadPoolExecutor(max_workers=self._number_of_concurrent_requests) as executor:
+            try:
+                for authors in executor.map(self._extract_authors, portions):
+                    self._authors.extend(authors)
+                    print(f"Extracted {len(authors)} authors")
+            except BaseException:
+                # the result is lost anyway, so the portions not started yet are not fetched
+                executor.shutdown(wait=False, cancel_futures=True)
+                raise
 
     def create_authors_by_topics_and_countries(self, topics: list[str], countries: list[str], saveas: str='csv'):
         '''
         Creates a collection of author names from a list of topics and a list of countries. The topics are concatenated;
-        the countries are iterated over, so that a cumulative list is created for the topics and countries, e.g.
-        topics = ["education", "nurse"], countries = ["China", "UK", "Australia"]: querying occurs with query strings like
-        "education+nurse+China", education+nurse+UK", education+nurse+Australia".
+        the countries are combined with OR, so that a cumulative list is created for the topics and countries, e.g.
+        topics = ["education", "nurse"], countries = ["China", "UK", "Australia"]: querying occurs with the query string
+        "education nurse ((China) OR (UK) OR (Australia))". If a query finds more articles than PubMed can page through,
+        the countries are split into groups queried one after another.
         @param topics: A list of topics.
         @param countries: A list of countries to iterate over.
         @param saveas: How to save the result: 'csv' (default): as CSV, 'json': as JSON, 'xml' as XML.
@@ -71,19 +197,23 @@ class PubMedNameFetcher:
         "education_nurse.json".
         @return: None.
         '''
-        basic_token = '+'.join(topics)
+        basic_token = ' '.join(topics)
+
+        # empty entries (e.g. the trailing line of a country file) would turn into empty OR terms
+        countries = [country.strip() for country in countries if country.strip()]
 
         self._authors.clear()
 
-        for country in countries:
+        for group, number_of_finds in self._get_country_groups(basic_token, countries):
             print("\n*************************************************")
-            print(f"****  Processing {country} ****")
+            print(f"****  Processing {', '.join(group)} ****")
             print("*************************************************\n")
 
-            token = f"{basic_token}+{country}"
-            self.fetch_author_names(token)
+            # the number of finds is known from the grouping, so it is not requested again
+            self.fetch_author_names(PubMedNameFetcher._get_countries_token(basic_token, group), overwrite=False,
+                                    number_of_finds=number_of_finds)
 
-        file_name = f"{basic_token}.{saveas}"
+        file_name = f"{'+'.join(topics)}.{saveas}"
 
         print(f"Saving results as {file_name}")
 
@@ -109,22 +239,19 @@ class PubMedNameFetcher:
         @param xml_file_name: The name of the XML file.
         @return: None.
         '''
-        x = XElement("Authors")
+        x = etree.Element("Authors")
         for author in self._authors:
-            x_author = ET.SubElement(x, "Author")
+            x_author = etree.SubElement(x, "Author")
 
-            x_family_name = ET.SubElement(x_author, "FamilyName")
+            x_family_name = etree.SubElement(x_author, "FamilyName")
             x_family_name.text = author.family_name
 
-            x_given_name = ET.SubElement(x_author, "GivenName")
+            x_given_name = etree.SubElement(x_author, "GivenName")
             x_given_name.text = author.given_name
 
-        with open(xml_file_name, "w", encoding="utf-8") as file:
-            raw_string = ET.tostring(x, 'utf-8').decode("utf-8")
-            reparsed = minidom.parseString(raw_string)
-            reparsed = reparsed.toprettyxml(indent="  ")
-
-            file.write(reparsed)
+        # indent in place and serialize in a single pass; both XML backends support this
+        etree.indent(x, space="  ")
+        etree.ElementTree(x).write(xml_file_name, encoding="utf-8", xml_declaration=True)
 
 
     def write_json(self, json_file_name):
@@ -134,9 +261,14 @@ class PubMedNameFetcher:
         @return:
         '''
         tuples = [(a.given_name, a.family_name) for a in self._authors]
-        json_string = json.dumps(tuples, ensure_ascii=False, indent=2)
+
+        if orjson is not None:
+            with open(json_file_name, "wb") as file:
+                file.write(orjson.dumps(tuples, option=orjson.OPT_INDENT_2))
+            return
+
         with open(json_file_name, "w", encoding="utf-8") as file:
-            file.write(json_string)
+            json.dump(tuples, file, ensure_ascii=False, indent=2)
 
     def write_csv(self, csv_file_name, separator = ','):
         '''
@@ -145,10 +277,10 @@ class PubMedNameFetcher:
         @param separator: The separator, default = ','.
         @return: None.
         '''
-        tuples = [(a.given_name, a.family_name) for a in self._authors]
-        with open(csv_file_name, "w", encoding="utf-8") as file:
-            for given, family in tuples:
-                file.write(f"{given}{separator}{family}\n")
+        # the writer quotes names containing the separator or quotes; the rows are written in one C-level loop
+        with open(csv_file_name, "w", encoding="utf-8", newline='') as file:
+            writer = csv.writer(file, delimiter=separator, lineterminator='\n')
+            writer.writerows((a.given_name, a.family_name) for a in self._authors)
     #endregion
 
     #region Private Auxiliary
@@ -158,42 +290,85 @@ class PubMedNameFetcher:
         @param token: The token.
         @return: Tne number of finds found.
         '''
-        request_url     = f"{PubMedNameFetcher.NCBI_SEARCH_REQUEST_BASE}&rettype=count&term={token}"
+        response = self._search({'rettype': 'count', 'term': token})
 
         try:
-            request     = requests.request("get", request_url)
-            response    = request.text
-            tree        = ET.fromstring(response)
-            x_count     = tree.find('Count')
-            return int(x_count.text)
-        except:
-            return 0
+            tree = etree.fromstring(response)
+        except etree.ParseError:
+            print(f"Invalid count response for token '{token}'")
+            raise
+
+        # a query rejected by NCBI comes without a count, and finds nothing
+        return int(tree.findtext('Count', default='0'))
+
+    def _get_country_groups(self, basic_token: str, countries: list[str]) -> list[tuple[list[str], int]]:
+        '''
+        Splits a list of countries into groups, each of which can be queried together with a basic token in one query.
+        A group is halved until its query finds no more articles than PubMed can page through, or until it consists
+        of a single country.
+        @param basic_token: The token the countries are added to.
+        @param countries: The list of countries.
+        @return: List of groups of countries, each with the number of articles found for it.
+        '''
+        if not countries:
+            return []
+
+        token = PubMedNameFetcher._get_countries_token(basic_token, countries)
+        number_of_finds = self._get_number_of_finds(token)
+
+        # a single country cannot be split further; paging its IDs is capped by _get_article_ids_for_token
+        if number_of_finds <= PubMedNameFetcher.MAXIMUM_NUMBER_OF_FINDS or len(countries) == 1:
+            return [(countries, number_of_finds)]
+
+        middle = len(countries) // 2
 
-    def _get_article_ids_for_token(self, token: str) -> list[str]:
+        return self._get_country_groups(basic_token, countries[:middle]) + \
+               self._get_country_groups(basic_token, countries[middle:])
+
+    @staticmethod
+    def _get_countries_token(basic_token: str, countries: list[str]) -> str:
+        '''
+        Creates a query token for a basic token and a list of countries combined with OR.
+        @param basic_token: The token the countries are added to.
+        @param countries: The list of countries.
+        @return: The query token, e.g. "education nurse ((China) OR (United Kingdom))".
         '''
-        Gets the list of article IDs for a token.
+        # each country is parenthesized, so that a name of several words stays one OR term
+        return f"{basic_token} ({' OR '.join(f'({country})' for country in countries)})"
+
+    def _get_article_ids_for_token(self, token: str, number_of_finds: Optional[int] = None) -> list[str]:
+        '''
+        Gets the list of article IDs for a token: at most MAXIMUM_NUMBER_OF_FINDS, the number esearch can page through.
         @param token: The token to find IDs for.
+        @param number_of_finds: The number of articles found for the token, if already known; None (default): it is
+        requested from the server.
         @return: List of IDs.
         '''
-        number_of_finds = self._get_number_of_finds(token)
+        if number_of_finds is None:
+            number_of_finds = self._get_number_of_finds(token)
 
         print(f"Found {number_of_finds} articles")
 
         if number_of_finds <= 0:
             return []
 
-        result = []
+        # esearch rejects a retstart beyond the maximum, so the pages after it are not requested
+        if number_of_finds > PubMedNameFetcher.MAXIMUM_NUMBER_OF_FINDS:
+            print(f"Warning: only the first {PubMedNameFetcher.MAXIMUM_NUMBER_OF_FINDS} of {number_of_finds} articles "
+                  f"found for '{token}' can be fetched")
+            number_of_finds = PubMedNameFetcher.MAXIMUM_NUMBER_OF_FINDS
+
+        # the number of finds gives all page offsets up front, so the pages can be fetched concurrently
+        size = PubMedNameFetcher.NUMBER_OF_IDS_IN_PARTIAL_REQUEST
+        starts = range(0, number_of_finds, size)
 
-        count_ids_downloaded = 0
-        start = 0
+        with ThreadPoolExecutor(max_workers=self._number_of_concurrent_requests) as executor:
+            ids_portions = executor.map(lambda start: self._get_portion_of_ids_for_token(token, start, size), starts)
 
-        while start < number_of_finds:
-            ids_portion = self._get_portion_of_ids_for_token(token, start, PubMedNameFetcher.NUMBER_OF_IDS_IN_PARTIAL_REQUEST)
-            result += ids_portion
-            count_ids_downloaded += len(ids_portion)
-            start += PubMedNameFetcher.NUMBER_OF_IDS_IN_PARTIAL_REQUEST
+            # map() keeps the order of the pages, so the IDs come in the order of esearch
+            result = list(chain.from_iterable(ids_portions))
 
-        print(f"count_ids_downloaded={count_ids_downloaded}, new start index = {start}")
+        print(f"count_ids_downloaded={len(result)}, pages = {len(starts)}")
 
         return result
 
@@ -205,57 +380,146 @@ class PubMedNameFetcher:
         @param number_of_entries: Number of IDs to fetch.
         @return: A list of IDs in the portion
         '''
-        result = []
-        search_url = f"{PubMedNameFetcher.NCBI_SEARCH_REQUEST_BASE}&retmax={number_of_entries}&retstart={start}&term={token}"
-        request = requests.request("get", search_url)
-        response = request.text
+        response = self._search({'retmax': number_of_entries, 'retstart': start, 'term': token})
 
         try:
-            tree = ET.fromstring(response)
-            x_id_list = tree.find('IdList')
+            tree = etree.fromstring(response)
+        except etree.ParseError:
+            print(f"Invalid ID response for token '{token}' from index {start}")
+            raise
 
-            for xId in x_id_list.findall('Id'):
-                result.append(xId.text)
+        # the IDs are read lazily, without an intermediate list of elements; a response without IdList yields none
+        result = [x_id.text for x_id in tree.iterfind('IdList/Id')]
 
-            print(f"Downloaded IDs from index {start}")
+        print(f"Downloaded IDs from index {start}")
 
-            return result
-        except:
-            return []
+        return result
 
     def _extract_authors(self, ids: list[str]) -> list[PubMedAuthorName]:
         '''
         Extracts author names from a number of articles given by their PubMed IDs.
+        If caching is enabled, the efetch response is read from or stored to the cache.
         @param ids: The list of IDs to extract authors from.
         @return: List of authors extracted.
         '''
-        result = []
+        cache_file_name = self._get_cache_file_name(','.join(sorted(ids)))
+
+        if self._is_cached(cache_file_name):
+            with gzip.open(cache_file_name, "rb") as source:
+                return self._parse_authors(source)
+
+        # the IDs are posted rather than put in the URL, which would be too long for a large portion
+        fetch_data = {'db': PubMedNameFetcher.NCBI_DATABASE, 'retmode': 'xml', 'id': ','.join(ids)}
 
-        fetch_url = f"{PubMedNameFetcher.NCBI_FETCH_REQUEST_BASE}&retmode=xml&id={','.join(ids)}"
+        # transient errors are retried by the session; a portion that still fails is reported, not skipped silently,
+        # as a missing portion would distort the name counts
+        self._rate_limiter.acquire()
 
         try:
-            request = requests.request("get", fetch_url)
-        except:
-            # at any net error, skip this portion
-            return []
+            request = self._session.post(PubMedNameFetcher.NCBI_FETCH_REQUEST_BASE, data=fetch_data,
+                                         timeout=PubMedNameFetcher.REQUEST_TIMEOUT, stream=True)
+            request.raise_for_status()
+        except requests.RequestException:
+            print(f"Fetch request failed: {PubMedNameFetcher.NCBI_FETCH_REQUEST_BASE} (IDs {ids[0]}...{ids[-1]})")
+            raise
+
+        with request:
+            # let urllib3 undo a gzip transfer encoding, so that the raw stream can be fed to the parser
+            request.raw.decode_content = True
+
+            # a failed read of the stream (a truncated body, a read timeout) surfaces as a requests exception, as
+            # a failed request does, and not as the urllib3 error of the raw stream
+            try:
+                if cache_file_name is None:
+                    return self._parse_authors(request.raw)
+
+                # write to a temporary file first, so that an interrupted download never shows up as a cache hit
+                with gzip.open(cache_file_name + ".part", "wb") as cache_file:
+                    shutil.copyfileobj(request.raw, cache_file)
+            except (OSError, UrllibHTTPError) as error:
+                print(f"Fetch response could not be read: {PubMedNameFetcher.NCBI_FETCH_REQUEST_BASE} "
+                      f"(IDs {ids[0]}...{ids[-1]})")
+                raise requests.ConnectionError(error, response=request) from error
+
+        os.replace(cache_file_name + ".part", cache_file_name)
+
+        with gzip.open(cache_file_name, "rb") as source:
+            return self._parse_authors(source)
+
+    def _parse_authors(self, source) -> list[PubMedAuthorName]:
+        '''
+        Parses author names from an efetch response.
+        @param source: A binary file-like object with the XML of the response.
+        @return: List of authors parsed.
+        '''
+        result = []
 
-        response = request.text
+        try:
+            # stream the articles one by one instead of building the whole DOM of the portion
+            for x_pubmed_article in iterparse_elements(source, 'PubmedArticle'):
+                result.extend(self._extract_authors_from_article(x_pubmed_article))
+        except etree.ParseError:
+            print("Invalid fetch response")
+            raise
+
+        return result
+
+    def _search(self, parameters: dict) -> bytes:
+        '''
+        Gets the response of an esearch request, from the cache if caching is enabled.
+        @param parameters: The query parameters of the request, except the database; requests URL-encodes them.
+        @return: The content of the response; it is left undecoded, as the XML declares its own encoding.
+        '''
+        parameters = {'db': PubMedNameFetcher.NCBI_DATABASE, **parameters}
+        cache_file_name = self._get_cache_file_name(f"{PubMedNameFetcher.NCBI_SEARCH_REQUEST_BASE}?{urlencode(parameters)}")
+
+        if self._is_cached(cache_file_name):
+            with gzip.open(cache_file_name, "rb") as cache_file:
+                return cache_file.read()
+
+        # transient errors are retried by the session; a search that still fails is reported with its URL
+        self._rate_limiter.acquire()
 
         try:
-            tree = ET.fromstring(response)
+            request = self._session.get(PubMedNameFetcher.NCBI_SEARCH_REQUEST_BASE, params=parameters,
+                                        timeout=PubMedNameFetcher.REQUEST_TIMEOUT)
+            request.raise_for_status()
+        except requests.RequestException:
+            print(f"Search request failed: {PubMedNameFetcher.NCBI_SEARCH_REQUEST_BASE}?{urlencode(parameters)}")
+            raise
 
-            for x_pubmed_article in tree.findall('PubmedArticle'):
-                try:
-                    authors = self._extract_authors_from_article(x_pubmed_article)
-                    result += authors
-                except:
-                    pass
+        if cache_file_name is not None:
+            with gzip.open(cache_file_name + ".part", "wb") as cache_file:
+                cache_file.write(request.content)
+            os.replace(cache_file_name + ".part", cache_file_name)
 
-            return result
-        except:
-            return []
+        return request.content
+
+    def _get_cache_file_name(self, key: str) -> Optional[str]:
+        '''
+        Gets the name of the cache file for a response.
+        @param key: The text identifying the response: the URL of a search, or the sorted IDs of an efetch portion.
+        @return: The name of the cache file, or None if caching is disabled.
+        '''
+        if self._cache_folder is None:
+            return None
+
+        digest = hashlib.blake2b(key.encode("utf-8")).hexdigest()[:16]
+
+        return os.path.join(self._cache_folder, f"{digest}.xml.gz")
 
-    def _extract_authors_from_article(self, x: ET.Element) -> list[PubMedAuthorName]:
+    def _is_cached(self, cache_file_name: Optional[str]) -> bool:
+        '''
+        Checks whether a response is in the cache and has not expired yet.
+        @param cache_file_name: The name of the cache file of the response, None if caching is disabled.
+        @return: True if the cached response can be used.
+        '''
+        if cache_file_name is None or not os.path.exists(cache_file_name):
+            return False
+
+        return time.time() - os.path.getmtime(cache_file_name) < PubMedNameFetcher.CACHE_EXPIRATION
+
+    def _extract_authors_from_article(self, x: etree.Element) -> list[PubMedAuthorName]:
         '''
         Extracts PubMed authors for an article represented by its XML Tree element.
         @param x: The XML tree element to extract authors from.
@@ -263,30 +527,26 @@ class PubMedNameFetcher:
         '''
         result = []
 
-        x_medline_citation = x.find('MedlineCitation')
-        x_article = x_medline_citation.find('Article')
-        x_author_list = x_article.find('AuthorList')
+        for x_author in PubMedNameFetcher.XPATH_AUTHORS(x):
+            last_name = x_author.findtext("LastName")
+            first_name = x_author.findtext("ForeName")
 
-        for x_author in x_author_list.findall('Author'):
-            last_name = x_author.find("LastName").text
-            first_name = x_author.find("ForeName").text
+            # a collective author or an author without a fore name is skipped, not the whole article;
+            # findtext returns '' for an empty element, which is no name either
+            if not last_name or not first_name:
+                continue
 
-            pubmedAuthor = PubMedAuthorName()
-            pubmedAuthor.family_name = last_name
-            pubmedAuthor.given_name = first_name
-
-            result.append(pubmedAuthor)
+            result.append(PubMedAuthorName(given_name=first_name, family_name=last_name))
 
         return result
     #endregion
 
 if __name__ == '__main__':
-    fetcher = PubMedNameFetcher()
-
-    topics = ["innovation"]
+    with PubMedNameFetcher() as fetcher:
+        topics = ["innovation"]
 
-    country_file = r"P:\Projects\1010.Alcor\Code\Python\countries2_no_china.txt"
+        country_file = r"P:\Projects\1010.Alcor\Code\Python\countries2_no_china.txt"
 
-    fetcher.create_authors_by_topics_and_country_file(topics, country_file)
+        fetcher.create_authors_by_topics_and_country_file(topics, country_file)
 
 
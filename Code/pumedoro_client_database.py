@@ -1,18 +1,38 @@
 import sqlite3
+from functools import lru_cache
 
 class PumedoroClientDatabase:
+    #region Class constants
+
+    # SQL statement for the selection of the occurrences of a name; the same text is compiled once and reused.
+    SQL_SELECTION_OCCURRENCES = "SELECT occ_given, occ_family FROM `name` WHERE name = ? LIMIT 1"
+
+    # Maximum number of names whose frequencies are kept in memory.
+    FREQUENCY_CACHE_SIZE = 100000
+    #endregion
+
     def __init__(self, database_path: str):
         self._connection = sqlite3.connect(database_path)
         self._cursor = self._connection.cursor()
 
+        # names are Zipf-distributed, so a per-instance LRU cache answers most lookups without a query;
+        # the database is only read by the client (even the index on the names is created by
+        # PumedoroDatabase.populate_names), so the cache never needs to be invalidated
+        self._cached_name_frequencies = lru_cache(maxsize=PumedoroClientDatabase.FREQUENCY_CACHE_SIZE)(
+            self._query_name_frequencies)
+
     def get_name_frequencies(self, name: str) ->(float, float):
-        command = f"SELECT * FROM `name` WHERE `name` = '{name}'"
-        result = self._cursor.execute(command)
-        result = self._cursor.fetchone()
+        return self._cached_name_frequencies(name)
+
+    def cache_info(self):
+        # hits, misses, maximum and current size of the frequency cache
+        return self._cached_name_frequencies.cache_info()
+
+    def _query_name_frequencies(self, name: str) ->(float, float):
+        result = self._connection.execute(PumedoroClientDatabase.SQL_SELECTION_OCCURRENCES, (name,)).fetchone()
 
         if result is not None:
-            occ_given = result[2]
-            occ_family = result[3]
+            occ_given, occ_family = result
 
             return (occ_given / (occ_given + occ_family), occ_family/ (occ_given + occ_family))
         else:
@@ -11,6 +11,25 @@ class PumedoroDatabase:
     # SQL statement for the creation of the table 'version'.
     SQL_CREATION_VERSION = "CREATE TABLE IF NOT EXISTS `version` (number INTEGER PRIMARY KEY AUTOINCREMENT, " \
                            "date_time TIME, comment VARCHAR(128))"
+
+    # SQL statement for the creation of an index on the names of the table 'name', for the lookups by name of the client.
+    SQL_CREATION_NAME_INDEX = "CREATE INDEX IF NOT EXISTS idx_name_name ON `name` (name)"
+
+    # SQL statement for the insertion of a record into the table 'name'.
+    SQL_INSERTION_NAME = "INSERT INTO `name` VALUES(null, ?, ?, ?, ?, ?)"
+
+    # SQL statements tuning the connection for bulk writes. The journal mode is left as it is: WAL would be stored in
+    # the database file, and the client could then not read the file from a read-only installation.
+    SQL_PRAGMAS = ["PRAGMA synchronous=NORMAL", "PRAGMA temp_store=MEMORY"]
+
+    # Columns of a name dictionary file and their types.
+    NAME_COLUMN_TYPES = {'name': str, 'occ_given': 'int64', 'occ_family': 'int64', 'soundex': str, 'metaphone': str}
+
+    # SQL statements delimiting the bulk insertion of names, so that a failed insertion can be undone without undoing
+    # the uncommitted changes made before it, such as those of clear_names.
+    SQL_SAVEPOINT_INSERTION = "SAVEPOINT insertion"
+    SQL_ROLLBACK_INSERTION = "ROLLBACK TO SAVEPOINT insertion"
+    SQL_RELEASE_INSERTION = "RELEASE SAVEPOINT insertion"
     #endregion
 
     def __init__(self, database_path: str):
@@ -21,16 +40,22 @@ class PumedoroDatabase:
         self._connection = sqlite3.connect(database_path)
         self._cursor = self._connection.cursor()
 
+        for pragma in PumedoroDatabase.SQL_PRAGMAS:
+            self._cursor.execute(pragma)
+
         self._cursor.execute(PumedoroDatabase.SQL_CREATION_NAME)
         self._cursor.execute(PumedoroDatabase.SQL_CREATION_VERSION)
 
     def load_data_frame(self, file_name: str):
         '''
         Loads a pandas DataFrame from a CSV file
+        The columns are parsed with fixed types; empty cells are read as empty strings, and names like 'None' or
+        'Null' are not mistaken for missing values.
         @param file_name: The name of the file.
         @return: The data frame loaded.
         '''
-        return pandas.read_csv(file_name, header=0)
+        return pandas.read_csv(file_name, header=0, usecols=list(PumedoroDatabase.NAME_COLUMN_TYPES),
+                               dtype=PumedoroDatabase.NAME_COLUMN_TYPES, keep_default_na=False)
 
     def clear_names(self):
         '''
@@ -42,28 +67,59 @@ class PumedoroDatabase:
     def populate_names(self, data_frame: pandas.DataFrame):
         '''
         Populates the `name` table of the database with data from a dafa frame.
+        Records without a name are not inserted but written to the file 'errors.txt'.
         @param data_frame: The data frame to populate with.
         @return: None.
         '''
-        error_file = open("errors.txt", "a")
+        names = data_frame[list(PumedoroDatabase.NAME_COLUMN_TYPES)]
+        valid = names['name'].fillna('') != ''
 
-        data_frame = data_frame.reset_index()
+        with open("errors.txt", "a") as error_file:
+            for index, name in names.loc[~valid, 'name'].items():
+                error_file.write(f"{index}: {name}\n")
 
-        length = data_frame.shape[0]
+            names = names[valid]
+            number_of_inserted = names.shape[0]
+
+            self._cursor.execute(PumedoroDatabase.SQL_SAVEPOINT_INSERTION)
 
-        # for record in data_frame:
-        for index, record in data_frame.iterrows():
             try:
-                name = record[2].replace("'", "''")
-                command = f"INSERT INTO `name` VALUES(null, '{name}', {record[3]}, {record[4]}, '{record[5]}', '{record[6]}')"
-                self._cursor.execute(command)
-                print(f"Processed {index} records of {length}")
-            except:
-                error_file.write(f"{record[1]}: {record[2]}")
-                continue
+                self._cursor.executemany(PumedoroDatabase.SQL_INSERTION_NAME,
+                                         names.itertuples(index=False, name=None))
+            except sqlite3.Error:
+                # undo the bulk insertion only, then insert one by one to find and skip the offending records
+                self._cursor.execute(PumedoroDatabase.SQL_ROLLBACK_INSERTION)
+                self._cursor.execute(PumedoroDatabase.SQL_RELEASE_INSERTION)
+                number_of_inserted = self._populate_names_record_by_record(names, error_file)
+            else:
+                self._cursor.execute(PumedoroDatabase.SQL_RELEASE_INSERTION)
+
+        # the index is built once the records are in, which is faster than maintaining it during the insertion;
+        # the client only reads the database, so it relies on the index being created here
+        self._cursor.execute(PumedoroDatabase.SQL_CREATION_NAME_INDEX)
+        self._connection.commit()
+
+        print(f"Inserted {number_of_inserted} records of {data_frame.shape[0]}")
+
+    def _populate_names_record_by_record(self, names: pandas.DataFrame, error_file) -> int:
+        '''
+        Populates the `name` table record by record, skipping the records that cannot be inserted.
+        @param names: The data frame to populate with, having the columns of the table.
+        @param error_file: The file to write the records skipped to.
+        @return: The number of records inserted.
+        '''
+        number_of_inserted = 0
+
+        for index, record in zip(names.index, names.itertuples(index=False, name=None)):
+            try:
+                self._cursor.execute(PumedoroDatabase.SQL_INSERTION_NAME, record)
+                number_of_inserted += 1
+            except sqlite3.Error:
+                error_file.write(f"{index}: {record[0]}\n")
 
         self._connection.commit()
-        error_file.close()
+
+        return number_of_inserted
 
 if __name__ == '__main__':
     database_path = "test_pumedoro.db3"
@@ -1,21 +1,30 @@
+import csv
 import json
+import os
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 from typing import Optional
-import xml.etree.ElementTree as ET
 import re
+import sys
 import pandas as pd
 import fuzzy
+from pubmed_author_name import PubMedAuthorNameStatItem
+from pumedoro_xml import iterparse_elements
+from itertools import islice
 import glob
 
 class PumedoroDictionaryCreator:
     # region Class Constants
     # Creates a name dictionary out of an XML file with raw given and family names extracted from PubMedArticles.
-    PREFIXES = ['JUNIOR', 'JUN.', 'JR.', 'JR', 'JR.', 'JR', 'JR.', 'JR', 'JÚNIOR',
-                'SENIOR', 'SEN.', 'SR.', 'SR', 'SR.', 'SR', 'SR.', 'SR', 'III', 'III', 'IV', 'IV']
+    # The prefixes are a set, for constant-time membership tests of upper-cased items.
+    PREFIXES = frozenset({'JUNIOR', 'JUN.', 'JR.', 'JR', 'JÚNIOR', 'SENIOR', 'SEN.', 'SR.', 'SR', 'III', 'IV'})
 
     # A given name item of two characters is valid if: (1) it has a capital letter as the first character,
     # (2) the second letter is a non-capitals vowel, or
     # (3) the item is 'Ng'
-    GIVEN_2CHAR_NAME_PATTERN = re.compile("^[A-Z][aeiouy]{1}$|^Ng$")
+    # The pattern is meant for fullmatch, so it needs no anchors.
+    GIVEN_2CHAR_NAME_PATTERN = re.compile("[A-Z][aeiouy]|Ng")
 
     # Regex of an abbreviation:
     # An item is an abbreviation if:
@@ -24,20 +33,41 @@ class PumedoroDictionaryCreator:
     #  * it contains one-letter elements followed by dots and '-': ("J.-B." -> []).
     ABBREVIATION_PATTERN = re.compile("^([A-Z]\.)+$|^([A-Z]\.)-([A-Z]\.)$")
 
-    # Regex for nobiliary particles (https://en.wikipedia.org/wiki/Nobiliary_particle)
-    NOBILIARITY_PARTICLES = ['aan', 'af', 'auf', 'da', 'dai', 'dal', 'dalla', 'das', 'de la', 'de', 'de', 'degli',
-                             'dei', 'del', 'della', 'dem', 'den', 'der', 'des', 'des', 'di', 'dos', 'du', 'het',
-                             'van', 'vom', 'von', 'zu', 'zur']
+    # Regex of a given name item to discard: a prefix (in any case) or an abbreviation, meant for match.
+    # One regex tests both in a single call instead of a set lookup of the upper-cased item and a regex.
+    DISCARDED_GIVEN_NAME_PATTERN = re.compile(
+        "(?i:" + "|".join(map(re.escape, sorted(PREFIXES, key=lambda p: (-len(p), p)))) + ")\\Z|"
+        + ABBREVIATION_PATTERN.pattern)
+
+    # Nobiliary particles (https://en.wikipedia.org/wiki/Nobiliary_particle), lower case, as a set for
+    # constant-time membership tests.
+    NOBILIARITY_PARTICLES = frozenset({'aan', 'af', 'auf', 'da', 'dai', 'dal', 'dalla', 'das', 'de la', 'de', 'degli',
+                                       'dei', 'del', 'della', 'dem', 'den', 'der', 'des', 'di', 'dos', 'du', 'het',
+                                       'van', 'vom', 'von', 'zu', 'zur'})
+
+    # Phonetic encoder; class-wide, so that the worker processes of update_dictionary can use it.
+    DOUBLE_METAPHONE = fuzzy.DMetaphone()
+
+    # Length of a Soundex value.
+    SOUNDEX_SIZE = 4
+
+    # Soundex digits of the letters ('0': a vowel, which is not encoded but separates equal digits);
+    # H and W are removed, so that they do not separate equal digits (American Soundex).
+    SOUNDEX_CODES = str.maketrans("ABCDEFGIJKLMNOPQRSTUVXYZ", "012301202245501262301202", "HW")
+
+    # Regex of the characters ignored by Soundex.
+    SOUNDEX_IGNORED_PATTERN = re.compile("[^A-Z]")
+
+    # Maximum number of names whose phonetic codes are kept in memory by a process.
+    PHONETIC_CACHE_SIZE = 200000
     #endregion
 
     def __init__(self):
         '''
         Initializes the internal dictionary.
-        The dictionary has a name (case-sensitive string) as the key and an instance of PumedoroName as the value.
+        The dictionary has a name (case-sensitive string) as the key and an instance of PubMedAuthorNameStatItem as the value.
         '''
         self._dictionary = {}
-        self._soundex = fuzzy.Soundex(4)
-        self._dmeta = fuzzy.DMetaphone()
 
     @property
     def dictionary(self):
@@ -57,18 +87,21 @@ class PumedoroDictionaryCreator:
                        otherwise the data frame is not sorted.
         @return: The resulting data frame.
         '''
-        data = []
-        for key in self._dictionary:
-            data.append([key, self._dictionary[key][0], self._dictionary[key][1], self._dictionary[key][2], self._dictionary[key][3]])
-
-        df = pd.DataFrame(data, columns=['name', 'occ_given', 'occ_family', 'soundex', 'metaphone'])
-
+        # the frame is built column by column, so that pandas does not have to convert row lists
+        entries = self._dictionary.values()
+        df = pd.DataFrame({'name':          list(self._dictionary),
+                           'occ_given':     [entry.occ_given for entry in entries],
+                           'occ_family':    [entry.occ_family for entry in entries],
+                           'soundex':       [entry.soundex for entry in entries],
+                           'metaphone':     [entry.metaphone for entry in entries]})
+
+        # a stable sort keeps rows with equal keys in the order the names were added
         if sortby == 'name':
-            df = df.sort_values(by='name')
+            df = df.sort_values(by='name', kind='stable')
         elif sortby == 'occ_given' or sortby == 'given':
-            df = df.sort_values(by='occ_given', ascending=False)
+            df = df.sort_values(by='occ_given', ascending=False, kind='stable')
         elif sortby == 'occ_family' or sortby == 'family':
-            df = df.sort_values(by='occ_family', ascending=False)
+            df = df.sort_values(by='occ_family', ascending=False, kind='stable')
 
         return df
 
@@ -79,20 +112,25 @@ class PumedoroDictionaryCreator:
         '''
         self._dictionary.clear()
 
-    def update_dictionary(self, folder: str):
+    def update_dictionary(self, folder: str, limit: Optional[int] = None):
         '''
         Updates the name dictionary from a folder containing XML files with raw extraction data. Works recursively:
         includes all subfolders of lower levels containing any XML files.
         @param folder: The path to the folder.
+        @param limit: The maximum number of files to process; None (default) processes all of them.
         @return: None.
         '''
-        file_names = glob.glob(folder + '/**/*.xml', recursive=True)
+        # the same files as glob.glob (hidden files are skipped), but found lazily, so that with a limit only
+        # the first files found are visited
+        file_names = list(islice(glob.iglob(folder + '/**/*.xml', recursive=True), limit))
+
+        # the files are parsed and their names encoded in worker processes; the parent only merges the entries
+        with ProcessPoolExecutor() as executor:
+            partial_dictionaries = executor.map(PumedoroDictionaryCreator._create_partial_dictionary, file_names)
 
-        count = 1
-        for file_name in file_names:
-            print(f"Processing file {file_name} ({count} of {len(file_names)})")
-            self.update_dictionary_from_file(file_name)
-            count += 1
+            for count, (file_name, partial_dictionary) in enumerate(zip(file_names, partial_dictionaries), start=1):
+                print(f"Processed file {file_name} ({count} of {len(file_names)})")
+                self._merge_partial_dictionary(partial_dictionary)
 
     def store_dictionary(self, file_name: str, sortby: str = ''):
         '''
@@ -101,8 +139,22 @@ class PumedoroDictionaryCreator:
         @param sortby: Indicates how to sort the rows in the output file. @see get_dataframe for details.
         @return: None.
         '''
-        df = self.get_dataframe(sortby)
-        df.to_csv(file_name)
+        # the rows are written straight from the dictionary, in the format of DataFrame.to_csv of get_dataframe:
+        # the first column is the index of the name in the order the names were added (the id of the entry)
+        entries = self._dictionary.values()
+
+        if sortby == 'name':
+            entries = sorted(entries, key=lambda entry: entry.value)
+        elif sortby == 'occ_given' or sortby == 'given':
+            entries = sorted(entries, key=lambda entry: -entry.occ_given)
+        elif sortby == 'occ_family' or sortby == 'family':
+            entries = sorted(entries, key=lambda entry: -entry.occ_family)
+
+        with open(file_name, "w", encoding="utf-8", newline='') as file:
+            writer = csv.writer(file, lineterminator=os.linesep)
+            writer.writerow(['', 'name', 'occ_given', 'occ_family', 'soundex', 'metaphone'])
+            writer.writerows((entry.id, entry.value, entry.occ_given, entry.occ_family, entry.soundex, entry.metaphone)
+                             for entry in entries)
 
     def update_dictionary_from_file(self, file_name: str):
         '''
@@ -110,42 +162,97 @@ class PumedoroDictionaryCreator:
         @param file_name: The name of the file.
         @return: None.
         '''
-        root = ET.parse(file_name).getroot()
-        authors = root.findall("Author")
+        self._merge_partial_dictionary(PumedoroDictionaryCreator._create_partial_dictionary(file_name))
 
-        for author in authors:
-            # Extract and handle raw string for the given names
-            given_name_raw = author.find("GivenName").text
+    # region Protected Auxiliary
+    @staticmethod
+    def _create_partial_dictionary(file_name: str) -> dict:
+        '''
+        Creates the name dictionary of a single XML file with raw extraction data, including the phonetic codes.
+        Does not touch the dictionary, so that files can be processed in worker processes.
+        @param file_name: The name of the file.
+        @return: The dictionary of the file, with the same entries as the name dictionary (not numbered yet).
+        '''
+        name_occurrences = PumedoroDictionaryCreator._count_names_in_file(file_name)
+
+        # the entries are created in the order the names are first found, author by author (given names, then the
+        # family name), as when the names were added to the dictionary one by one
+        partial_dictionary = {}
+        for (name, is_family_name), occurrences in name_occurrences.items():
+            entry = partial_dictionary.get(name)
+
+            if entry is None:
+                entry = PubMedAuthorNameStatItem(value=name,
+                                                 soundex=PumedoroDictionaryCreator._get_soundex(name),
+                                                 metaphone=PumedoroDictionaryCreator._get_metaphone(name))
+                partial_dictionary[name] = entry
+
+            if is_family_name:
+                entry.occ_family = occurrences
+            else:
+                entry.occ_given = occurrences
 
-            given_names = self._get_given_names(given_name_raw)
+        return partial_dictionary
 
-            for given_name in given_names:
-                if given_name is None:
-                    continue
+    @staticmethod
+    def _count_names_in_file(file_name: str) -> Counter:
+        '''
+        Counts the valid given and family names in an XML file with raw extraction data.
+        Does not touch the dictionary, so that files can be processed in worker processes.
+        @param file_name: The name of the file.
+        @return: The occurrences of the names, by (name, is_family_name), in the order the names are first found.
+        '''
+        # the names are collected per file and counted in bulk at the end, by Counter's C counting loop;
+        # a single list keeps the order of the names across given and family names
+        names = []
 
-                given_name = given_name.title()
+        # stream the authors one by one instead of loading the whole file
+        for author in iterparse_elements(file_name, 'Author'):
+            # Extract and handle raw string for the given names; an author without them still has a family name
+            given_name_raw = author.findtext("GivenName")
 
-                if given_name in self._dictionary:
-                    self._dictionary[given_name][0] += 1
-                else:
-                    self._dictionary[given_name] = [1, 0, self._get_soundex(given_name), self._get_metaphone(given_name)]
+            # most names come title-cased already; for ASCII, istitle() guarantees that title() would not change them,
+            # so no new string is created for them
+            if given_name_raw is not None:
+                names.extend((given_name if given_name.isascii() and given_name.istitle() else given_name.title(), False)
+                             for given_name in PumedoroDictionaryCreator._get_given_names(given_name_raw))
 
             # Extract and handle raw string for the family name
-            family_name_raw = author.find("FamilyName").text
-            family_name = self._get_family_name(family_name_raw)
+            family_name_raw = author.findtext("FamilyName")
+            family_name = PumedoroDictionaryCreator._get_family_name(family_name_raw)
 
-            if family_name is None:
+            # an empty FamilyName element, or one made only of prefixes, has no valid family name
+            if not family_name:
                 continue
 
-            family_name = family_name.title()
+            names.append((family_name if family_name.isascii() and family_name.istitle() else family_name.title(), True))
 
-            if family_name in self._dictionary:
-                self._dictionary[family_name][1] += 1
+        return Counter(names)
+
+    def _merge_partial_dictionary(self, partial_dictionary: dict):
+        '''
+        Adds the entries of a partial dictionary to the name dictionary.
+        @param partial_dictionary: The dictionary of a single file, @see _create_partial_dictionary.
+        @return: None.
+        '''
+        # one lookup per name: the entry found is updated in place
+        dictionary = self._dictionary
+        for name, entry in partial_dictionary.items():
+            existing_entry = dictionary.get(name)
+
+            if existing_entry is None:
+                # the key and the value of the entry share one interned string; the entries are numbered in the order
+                # they are added
+                name = sys.intern(name)
+                entry.id = len(dictionary)
+                entry.value = name
+                dictionary[name] = entry
             else:
-                self._dictionary[family_name] = [0, 1, self._get_soundex(family_name), self._get_metaphone(family_name)]
+                existing_entry.occ_given += entry.occ_given
+                existing_entry.occ_family += entry.occ_family
 
-    # region Protected Auxiliary
-    def _get_given_names(self, name_string: str, apply_strict_rules: bool = False) -> list[str]:
+    @staticmethod
+    def _get_given_names(name_string: str, apply_strict_rules: bool = False) -> list[str]:
         '''
         Extracts valid given names from a raw name string.
         @param name_string: The raw string to extract from.
@@ -153,72 +260,98 @@ class PumedoroDictionaryCreator:
             if confusion of given and family names may be detected (ignored in current version).
         @return: List of valid given names.
         '''
-        # (1) split by space:
-        items = name_string.split(' ')
-
-        # (2) Remove all prefixes
-        items = [x for x in items if x.upper() not in PumedoroDictionaryCreator.PREFIXES]
+        particles = PumedoroDictionaryCreator.NOBILIARITY_PARTICLES
 
-        # (3) Remove all one-letter items
-        items = [x for x in items if len(x) >= 2]
-
-        # (*) Ignore entries like "A.B.C." and "A.-B."
-        items = [x for x in items if not (PumedoroDictionaryCreator.ABBREVIATION_PATTERN.match(x))]
-
-        # (4) Handle two-character items
-        for item in items:
-            if len(item) == 2 and item not in PumedoroDictionaryCreator.NOBILIARITY_PARTICLES:
-                if not PumedoroDictionaryCreator.GIVEN_2CHAR_NAME_PATTERN.match(item.strip()):
-                    items.remove(item)
+        # (1) split by space, and in the same pass:
+        # (3) remove all one-letter items,
+        # (2) remove all prefixes and (*) ignore entries like "A.B.C." and "A.-B.",
+        # (4) handle two-character items: keep particles and items matching the two-character name pattern
+        items = [x for x in name_string.split(' ')
+                 if len(x) >= 2
+                 and not PumedoroDictionaryCreator.DISCARDED_GIVEN_NAME_PATTERN.match(x)
+                 and (len(x) > 2 or x in particles or PumedoroDictionaryCreator.GIVEN_2CHAR_NAME_PATTERN.fullmatch(x))]
 
         # (5) Handle nobiliarity particles: if a n.p. is found, remove it and all following items
-        for particle in PumedoroDictionaryCreator.NOBILIARITY_PARTICLES:
-            items_lower = [i.lower() for i in items]
-            if particle in items_lower:
-                index = items_lower.index(particle)
+        # (cutting at the first particle is the same as cutting at every particle found in turn)
+        for index, item in enumerate(items):
+            if item.lower() in particles:
                 del items[index:]
+                break
 
         return items
 
-    def _get_family_name(self, name_string: str) -> Optional[str]:
+    @staticmethod
+    def _get_family_name(name_string: str) -> Optional[str]:
         '''
         Extracts valid family name from a raw name string.
         @param name_string: The raw string to extract from.
         @return: The valid family name.
         '''
-        # (1) split by space:
-        try:
-            items = name_string.split(' ')
-        except:
+        # a missing family name has no text
+        if name_string is None:
             return None
 
-        # (2) Remove all prefixes
-        items = [x for x in items if x.upper() not in PumedoroDictionaryCreator.PREFIXES]
+        # (1) split by space:
+        items = name_string.split(' ')
 
-        return ' '.join(items)
+        # (2) Remove all prefixes
+        return ' '.join(x for x in items if x.upper() not in PumedoroDictionaryCreator.PREFIXES)
 
-    def _get_soundex(self, text: str):
+    # the codes are cached per process: names are Zipf-distributed and recur in the files handled by a worker
+    @staticmethod
+    @lru_cache(maxsize=PHONETIC_CACHE_SIZE)
+    def _get_soundex(text: str):
         '''
-        Computes the Soundex of a string.
+        Computes the American Soundex of a string: the first letter is kept, the following letters are replaced by
+        their digits, adjacent equal digits (also across H and W, and including the digit of the first letter) are
+        written once, vowels are dropped, and the value is padded with '0', e.g. "Robert" -> "R163",
+        "Tymczak" -> "T522", "Pfister" -> "P236".
         @param text: The string to compute Soundex for.
-        @return: The Soundex value.
+        @return: The Soundex value, or an empty string for an empty or non-ASCII string, or one without letters.
         '''
-        try:
-            return self._soundex(text)
-        except:
+        # fuzzy.Soundex cannot be used under Python 3: it returns undefined characters instead of the value.
+        # The algorithm is short enough to run in Python, with translate() doing the encoding in C.
+        if not text or not text.isascii():
             return ''
 
-    def _get_metaphone(self, text: str):
+        letters = PumedoroDictionaryCreator.SOUNDEX_IGNORED_PATTERN.sub('', text.upper())
+        if not letters:
+            return ''
+        size = PumedoroDictionaryCreator.SOUNDEX_SIZE
+        codes = PumedoroDictionaryCreator.SOUNDEX_CODES
+
+        result = letters[:1]
+        previous_code = letters[:1].translate(codes)
+        for code in letters[1:].translate(codes):
+            if len(result) == size:
+                break
+
+            if code != '0' and code != previous_code:
+                result += code
+
+            previous_code = code
+
+        return result.ljust(size, '0')
+
+    @staticmethod
+    @lru_cache(maxsize=PHONETIC_CACHE_SIZE)
+    def _get_metaphone(text: str):
         '''
         Computes the Methaphone of a string.
         @param text: The string to compute Methaphone for.
-        @return: The Methaphone value.
+        @return: The Methaphone value, or an empty string for an empty or non-ASCII string.
         '''
+        if not text or not text.isascii():
+            return ''
+
         try:
-            return self._dmeta(text)[0].decode("utf-8")
-        except:
+            metaphone = PumedoroDictionaryCreator.DOUBLE_METAPHONE(text)[0]
+        except UnicodeError:
             return ''
 
+        # a string without phonetic content (e.g. "-") has no metaphone
+        return metaphone.decode("utf-8") if metaphone is not None else ''
+
     #endregion
 
 if __name__ == '__main__':
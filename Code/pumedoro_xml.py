@@ -0,0 +1,49 @@
+'''
+XML backend of Pumedoro: lxml if it is installed, else the ElementTree of the standard library.
+Both provide the same API for building, finding and writing elements; the functions below cover the parts that differ.
+'''
+try:
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:
+    import xml.etree.ElementTree as etree
+    LXML_AVAILABLE = False
+
+def iterparse_elements(source, tag: str):
+    '''
+    Parses an XML document incrementally and yields its elements with a given tag, each of them complete.
+    After an element has been processed, it is cleared and released, so that the memory used does not grow
+    with the size of the document.
+    @param source: The name of the XML file, or a binary file-like object.
+    @param tag: The tag of the elements to yield.
+    @return: Generator of the elements.
+    '''
+    if LXML_AVAILABLE:
+        for _, element in etree.iterparse(source, tag=tag, huge_tree=True):
+            yield element
+
+            # free the element processed and its preceding siblings
+            element.clear()
+            while element.getprevious() is not None:
+                del element.getparent()[0]
+    else:
+        events = etree.iterparse(source, events=('start', 'end'))
+        _, root = next(events)
+
+        for event, element in events:
+            if event == 'end' and element.tag == tag:
+                yield element
+
+                # the parser keeps the open elements itself, so the processed ones can be dropped from the root
+                root.clear()
+
+def compile_path(path: str):
+    '''
+    Compiles a path of elements relative to an element.
+    @param path: The path, e.g. 'MedlineCitation/Article/AuthorList/Author'.
+    @return: A function returning the elements found at the path of an element, as a list or an iterator.
+    '''
+    if LXML_AVAILABLE:
+        return etree.XPath(path)
+
+    return lambda element: element.iterfind(path)
@@ -0,0 +1,36 @@
+import threading
+import time
+
+class RequestRateLimiter:
+    '''
+    Limits the rate of requests sent by any number of threads (token bucket): a request takes a token, and the tokens
+    are refilled evenly over time. The bucket holds a single token, so that the requests are spaced
+    1/requests_per_second apart and no burst exceeds the rate within any second.
+    '''
+    def __init__(self, requests_per_second: float):
+        '''
+        Initializes the limiter.
+        @param requests_per_second: The maximal number of requests per second.
+        '''
+        self._rate = requests_per_second
+        self._tokens = 1
+        self._last_refill = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        '''
+        Waits until a request may be sent.
+        @return: None.
+        '''
+        # the lock is held while waiting, so that the waiting threads are served one after another
+        with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(1, self._tokens + (now - self._last_refill) * self._rate)
+                self._last_refill = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                time.sleep((1 - self._tokens) / self._rate)
@@ -0,0 +1,70 @@
+import io
+import unittest
+
+from pubmed_author_name import PubMedAuthorName
+from pubmed_name_fetcher import PubMedNameFetcher
+
+class TestCountryGroups(unittest.TestCase):
+    # Numbers of articles found per country; the number found for a group is their sum.
+    FINDS = {"China": 8000, "Malta": 100, "United Kingdom": 3000, "India": 12000}
+
+    def setUp(self):
+        self.fetcher = PubMedNameFetcher()
+        self.fetcher._get_number_of_finds = self._get_number_of_finds
+        self.tokens = []
+
+    def tearDown(self):
+        self.fetcher.close()
+
+    def _get_number_of_finds(self, token: str) -> int:
+        self.tokens.append(token)
+        return sum(finds for country, finds in TestCountryGroups.FINDS.items() if f"({country})" in token)
+
+    def test_countries_token(self):
+        self.assertEqual(PubMedNameFetcher._get_countries_token("education nurse", ["China", "United Kingdom"]),
+                         "education nurse ((China) OR (United Kingdom))")
+
+    def test_no_countries(self):
+        self.assertEqual(self.fetcher._get_country_groups("nurse", []), [])
+        self.assertEqual(self.tokens, [])
+
+    def test_one_group(self):
+        self.assertEqual(self.fetcher._get_country_groups("nurse", ["Malta", "United Kingdom"]),
+                         [(["Malta", "United Kingdom"], 3100)])
+        self.assertEqual(self.tokens, ["nurse ((Malta) OR (United Kingdom))"])
+
+    def test_split(self):
+        self.assertEqual(self.fetcher._get_country_groups("nurse", ["China", "Malta", "United Kingdom"]),
+                         [(["China"], 8000), (["Malta", "United Kingdom"], 3100)])
+
+    def test_single_country_above_maximum(self):
+        # a single country is not split further, even if it finds more than can be paged through
+        self.assertEqual(self.fetcher._get_country_groups("nurse", ["India", "Malta"]),
+                         [(["India"], 12000), (["Malta"], 100)])
+        self.assertEqual(self.fetcher._get_country_groups("nurse", ["India"]), [(["India"], 12000)])
+
+class TestParseAuthors(unittest.TestCase):
+    # An efetch response with a collective author and authors with empty or missing names.
+    RESPONSE = b'''<?xml version="1.0"?>
+<PubmedArticleSet>
+  <PubmedArticle><MedlineCitation><Article><AuthorList>
+    <Author><LastName>Borg</LastName><ForeName>Maria</ForeName></Author>
+    <Author><CollectiveName>Malta Nursing Group</CollectiveName></Author>
+    <Author><LastName/><ForeName>Anna</ForeName></Author>
+  </AuthorList></Article></MedlineCitation></PubmedArticle>
+  <PubmedArticle><MedlineCitation><Article><AuthorList>
+    <Author><LastName>Camilleri</LastName><ForeName/></Author>
+    <Author><LastName>Vella</LastName></Author>
+    <Author><LastName>Zammit</LastName><ForeName>Joseph</ForeName></Author>
+  </AuthorList></Article></MedlineCitation></PubmedArticle>
+</PubmedArticleSet>'''
+
+    def test_nameless_authors_skipped(self):
+        with PubMedNameFetcher() as fetcher:
+            authors = fetcher._parse_authors(io.BytesIO(TestParseAuthors.RESPONSE))
+
+        self.assertEqual(authors, [PubMedAuthorName(given_name="Maria", family_name="Borg"),
+                                   PubMedAuthorName(given_name="Joseph", family_name="Zammit")])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import os
+import tempfile
+import unittest
+
+import pandas
+
+from pumedoro_database import PumedoroDatabase
+
+class TestPopulateNames(unittest.TestCase):
+    COLUMNS = list(PumedoroDatabase.NAME_COLUMN_TYPES)
+
+    def setUp(self):
+        # populate_names writes errors.txt to the working directory, so the test runs in a temporary one
+        self.working_directory = os.getcwd()
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        os.chdir(self.temporary_directory.name)
+
+        self.database = PumedoroDatabase("test.db3")
+
+    def tearDown(self):
+        self.database._connection.close()
+        os.chdir(self.working_directory)
+        self.temporary_directory.cleanup()
+
+    def _get_names(self) -> list[str]:
+        return [name for (name,) in self.database._cursor.execute("SELECT name FROM `name` ORDER BY id")]
+
+    def test_populate(self):
+        self.database.populate_names(pandas.DataFrame([["Anna", 2, 0, "A500", "AN"], ["", 1, 0, "", ""],
+                                                       ["Borg", 0, 3, "B620", "PRK"]], columns=self.COLUMNS))
+
+        self.assertEqual(self._get_names(), ["Anna", "Borg"])
+
+        with open("errors.txt") as error_file:
+            self.assertEqual(error_file.read(), "1: \n")
+
+    def test_failed_record_keeps_cleared_names_deleted(self):
+        self.database.populate_names(pandas.DataFrame([["Old1", 1, 0, "", ""], ["Old2", 1, 0, "", ""]],
+                                                      columns=self.COLUMNS))
+        self.database.clear_names()
+
+        # a list cannot be bound as a parameter, so the bulk insertion fails and the records are inserted one by one
+        self.database.populate_names(pandas.DataFrame([["New1", 1, 0, "", ""], ["New2", 1, 0, [1], ""],
+                                                       ["New3", 1, 0, "", ""]], columns=self.COLUMNS))
+
+        self.assertEqual(self._get_names(), ["New1", "New3"])
+
+        with open("errors.txt") as error_file:
+            self.assertEqual(error_file.read(), "1: New2\n")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+
+from pumedoro_dictionary_creator import PumedoroDictionaryCreator
+
+class TestSoundex(unittest.TestCase):
+    # Known American Soundex values.
+    KNOWN_CODES = {
+        "Robert": "R163",
+        "Rupert": "R163",
+        "Rubin": "R150",
+        "Ashcraft": "A261",
+        "Ashcroft": "A261",
+        "Tymczak": "T522",
+        "Pfister": "P236",
+        "Honeyman": "H555",
+        "Lee": "L000",
+        "Lloyd": "L300",
+        "Washington": "W252",
+    }
+
+    def test_known_codes(self):
+        for name, code in TestSoundex.KNOWN_CODES.items():
+            with self.subTest(name=name):
+                self.assertEqual(PumedoroDictionaryCreator._get_soundex(name), code)
+
+    def test_case_and_ignored_characters(self):
+        self.assertEqual(PumedoroDictionaryCreator._get_soundex("o'brien"), "O165")
+        self.assertEqual(PumedoroDictionaryCreator._get_soundex("Smith-Jones"), "S532")
+
+    def test_empty_and_non_ascii(self):
+        self.assertEqual(PumedoroDictionaryCreator._get_soundex(""), "")
+        self.assertEqual(PumedoroDictionaryCreator._get_soundex("Müller"), "")
+        self.assertEqual(PumedoroDictionaryCreator._get_soundex("-"), "")
+        self.assertEqual(PumedoroDictionaryCreator._get_soundex("'"), "")
+
+class TestGivenNames(unittest.TestCase):
+    def test_item_after_removed_item(self):
+        # an invalid item right after a removed one is removed as well
+        self.assertEqual(PumedoroDictionaryCreator._get_given_names("la Ab"), [])
+        self.assertEqual(PumedoroDictionaryCreator._get_given_names("Anna la Ab Maria"), ["Anna", "Maria"])
+
+    def test_prefixes(self):
+        self.assertEqual(PumedoroDictionaryCreator._get_given_names("Anna jr. Maria JUNIOR Sr Iv"), ["Anna", "Maria"])
+
+    def test_abbreviations(self):
+        self.assertEqual(PumedoroDictionaryCreator._get_given_names("J.-B. Anna R.N.J. Jean"), ["Anna", "Jean"])
+        self.assertEqual(PumedoroDictionaryCreator._get_given_names("M G M O"), [])
+
+    def test_two_character_items(self):
+        self.assertEqual(PumedoroDictionaryCreator._get_given_names("Jo Ng Ab Yu Anna"), ["Jo", "Ng", "Yu", "Anna"])
+
+    def test_nobiliarity_particles(self):
+        self.assertEqual(PumedoroDictionaryCreator._get_given_names("Anna de Maria"), ["Anna"])
+        self.assertEqual(PumedoroDictionaryCreator._get_given_names("Anna Maria van Berg de Laan"), ["Anna", "Maria"])
+        self.assertEqual(PumedoroDictionaryCreator._get_given_names("Hans VON Karl"), ["Hans"])
+
+if __name__ == '__main__':
+    unittest.main()